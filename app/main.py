@@ -1,13 +1,29 @@
 from __future__ import annotations
 
+from collections import OrderedDict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import asyncio
+import glob
+import gzip
+import math
+import multiprocessing
+import os
 import re
 import unicodedata
 
 from openpyxl import load_workbook
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+try:
+    import brotli  # type: ignore
+except ImportError:  # brotli é opcional
+    brotli = None
 
 
 APP_ROOT = Path(__file__).resolve().parent
@@ -15,17 +31,113 @@ PROJECT_ROOT = APP_ROOT.parent
 EXCEL_PATH = PROJECT_ROOT / "base_barcos_dummy.xlsx"
 
 
-app = FastAPI(title="OnBordo - API de Veleiros", version="1.0.0")
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_list(name: str, sep: str) -> List[str]:
+    return [item.strip() for item in os.environ.get(name, "").split(sep) if item.strip()]
+
+
+# Planilhas de origem (globs separados por ";"); vazio usa apenas EXCEL_PATH
+EXCEL_SOURCES = _env_list("ONBORDO_EXCEL_SOURCES", ";")
+# Abas lidas de cada planilha (separadas por vírgula, "*" para todas); vazio usa a aba ativa
+EXCEL_SHEETS = _env_list("ONBORDO_EXCEL_SHEETS", ",")
+
+# Pools para etapas pesadas: leitura da planilha em processos, varreduras em threads
+INGEST_WORKERS = _env_int("ONBORDO_INGEST_WORKERS", os.cpu_count() or 1)
+SCAN_WORKERS = _env_int("ONBORDO_SCAN_WORKERS", 4)
+# Orçamento (bytes) do cache de respostas, somando as variantes com e sem compressão
+RESPONSE_CACHE_BYTES = _env_int("ONBORDO_RESPONSE_CACHE_BYTES", 32 * 1024 * 1024)
+# Respostas menores que isto não são comprimidas
+COMPRESS_MIN_BYTES = 1024
+# Níveis moderados: ganho marginal de tamanho nos níveis máximos custa o dobro de CPU
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# Controle de admissão: consultas com custo estimado acima do limiar são "caras".
+# Uma unidade de custo ~ uma linha visitada por um filtro (~0,5 µs); o padrão
+# corresponde a ~100 ms de CPU, p.ex. devolver ~2 mil linhas com todas as colunas
+EXPENSIVE_QUERY_COST = _env_float("ONBORDO_EXPENSIVE_QUERY_COST", 200000)
+# Concorrência máxima e tamanho da fila de espera por classe de custo
+ADMISSION_LIMITS: Dict[str, Tuple[int, int]] = {
+    "cheap": (_env_int("ONBORDO_CHEAP_QUERY_LIMIT", 64), _env_int("ONBORDO_CHEAP_QUERY_QUEUE", 256)),
+    "expensive": (_env_int("ONBORDO_EXPENSIVE_QUERY_LIMIT", 2), _env_int("ONBORDO_EXPENSIVE_QUERY_QUEUE", 8)),
+}
+# Tempo máximo na fila antes de responder 503, e o Retry-After sugerido
+ADMISSION_WAIT_SECONDS = _env_float("ONBORDO_ADMISSION_WAIT_SECONDS", 2.0)
+RETRY_AFTER_SECONDS = _env_int("ONBORDO_RETRY_AFTER_SECONDS", 1)
+
+_EXECUTORS: Dict[str, Optional[Executor]] = {"ingest": None, "scan": None}
+_INGEST_POOL_SIZE = 0
+_INGEST_LOCK: Optional[asyncio.Lock] = None
+_ADMISSION: Dict[str, Dict[str, Any]] = {}
+
+
+def _get_ingest_executor(shards: int) -> Optional[Executor]:
+    global _INGEST_POOL_SIZE
+    # INGEST_WORKERS <= 0 desativa o pool de processos (usa o executor padrão do loop)
+    if INGEST_WORKERS <= 0:
+        return None
+    # Não sobe mais processos do que planilhas a ler; cresce se vierem mais
+    wanted = max(1, min(INGEST_WORKERS, shards))
+    if _EXECUTORS["ingest"] is None or _INGEST_POOL_SIZE < wanted:
+        if _EXECUTORS["ingest"] is not None:
+            _EXECUTORS["ingest"].shutdown(wait=False)
+        # "spawn": o pool é criado com o servidor já rodando várias threads
+        _EXECUTORS["ingest"] = ProcessPoolExecutor(max_workers=wanted, mp_context=multiprocessing.get_context("spawn"))
+        _INGEST_POOL_SIZE = wanted
+    return _EXECUTORS["ingest"]
+
+
+def _get_scan_executor() -> Executor:
+    if _EXECUTORS["scan"] is None:
+        _EXECUTORS["scan"] = ThreadPoolExecutor(max_workers=max(1, SCAN_WORKERS), thread_name_prefix="onbordo-scan")
+    return _EXECUTORS["scan"]  # type: ignore
+
+
+def _get_ingest_lock() -> asyncio.Lock:
+    global _INGEST_LOCK
+    if _INGEST_LOCK is None:
+        _INGEST_LOCK = asyncio.Lock()
+    return _INGEST_LOCK
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    yield
+    for key, executor in _EXECUTORS.items():
+        if executor is not None:
+            executor.shutdown(wait=False)
+            _EXECUTORS[key] = None
+
+
+app = FastAPI(title="OnBordo - API de Veleiros", version="1.0.0", lifespan=_lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "Retry-After"],
 )
 
 
-_CACHE: Dict[str, Any] = {"df": None, "services_column": None, "alias_map": None}
+_CACHE: Dict[str, Any] = {"df": None, "headers": None, "services_column": None, "alias_map": None, "by_id": None, "generation": 0}
+# Respostas serializadas de /boats por (geração do snapshot, consulta), em ordem LRU
+_RESPONSES: Dict[str, Any] = {"entries": OrderedDict(), "bytes": 0}
+# Linhas já lidas por planilha, com a impressão digital (mtime, tamanho) usada para evitar releituras
+_SHARDS: Dict[str, Dict[str, Any]] = {}
 
 
 def _normalize_name(name: Any) -> str:
@@ -47,40 +159,83 @@ def _normalize_services_cell(cell: Any) -> List[str]:
     return [p for p in parts if p]
 
 
-def _load_dataframe(refresh: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str], Dict[str, str]]:
-    global _CACHE
-    if _CACHE["df"] is not None and not refresh:
-        return list(_CACHE["df"]), _CACHE["services_column"], dict(_CACHE["alias_map"])  # type: ignore
+def _resolve_sources() -> List[Path]:
+    if not EXCEL_SOURCES:
+        return [EXCEL_PATH]
 
-    if not EXCEL_PATH.exists():
-        raise FileNotFoundError(f"Arquivo Excel não encontrado em: {EXCEL_PATH}")
+    paths: List[Path] = []
+    for pattern in EXCEL_SOURCES:
+        full = Path(pattern) if Path(pattern).is_absolute() else PROJECT_ROOT / pattern
+        if glob.has_magic(str(full)):
+            paths.extend(Path(m) for m in sorted(glob.glob(str(full))) if Path(m).is_file())
+        else:
+            paths.append(full)
 
-    # Carrega Excel com openpyxl
-    wb = load_workbook(EXCEL_PATH)
-    ws = wb.active
-    
-    # Extrai dados como lista de dicionários
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows:
-        raise ValueError("Planilha vazia")
-    
-    headers = [str(cell) if cell is not None else f"col_{i}" for i, cell in enumerate(rows[0])]
-    data_rows = rows[1:]
-    
-    # Converte para lista de dicionários com ID
-    records = []
-    for i, row in enumerate(data_rows):
-        record = {"id": i}
-        for j, value in enumerate(row):
-            if j < len(headers):
-                record[headers[j]] = value
-        records.append(record)
+    if not paths:
+        raise FileNotFoundError(f"Nenhuma planilha encontrada em: {'; '.join(EXCEL_SOURCES)}")
+    # Remove duplicados preservando a ordem (define a sequência dos ids)
+    return list(dict.fromkeys(paths))
+
+
+def _fingerprint(path: Path) -> Tuple[int, int]:
+    if not path.exists():
+        raise FileNotFoundError(f"Arquivo Excel não encontrado em: {path}")
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
 
-    # Constrói mapa de apelidos
-    alias_map: Dict[str, str] = {}
-    for col in headers:
-        alias = _normalize_name(col)
-        alias_map.setdefault(alias, col)
+
+def _read_workbook(path: str, sheets: Optional[List[str]] = None) -> Dict[str, List[Tuple[Any, ...]]]:
+    # Executado no pool de processos: só recebe/retorna tipos serializáveis
+    wb = load_workbook(path, read_only=True)
+    try:
+        if not sheets:
+            selected = [wb.active]
+        elif sheets == ["*"]:
+            selected = list(wb.worksheets)
+        else:
+            missing = [name for name in sheets if name not in wb.sheetnames]
+            if missing:
+                raise ValueError(f"Aba(s) não encontrada(s) em {path}: {', '.join(missing)}")
+            selected = [wb[name] for name in sheets]
+        result = {}
+        for ws in selected:
+            # Em modo read_only o <dimension> gravado pode cortar linhas/colunas;
+            # sem ele as linhas vêm com larguras diferentes, então completa como no modo normal
+            ws.reset_dimensions()
+            rows = list(ws.iter_rows(values_only=True))
+            width = max((len(row) for row in rows), default=0)
+            result[ws.title] = [row + (None,) * (width - len(row)) for row in rows]
+        return result
+    finally:
+        wb.close()
+
+
+def _stale_sources(paths: List[Path]) -> List[Tuple[Path, Tuple[int, int]]]:
+    stale = []
+    for path in paths:
+        fp = _fingerprint(path)
+        shard = _SHARDS.get(str(path))
+        if shard is None or shard["fingerprint"] != fp:
+            stale.append((path, fp))
+    return stale
+
+
+def _needs_rebuild(paths: List[Path], stale: List[Tuple[Path, Tuple[int, int]]]) -> bool:
+    return _CACHE["df"] is None or bool(stale) or set(_SHARDS) != {str(p) for p in paths}
+
+
+def _merge_shards(paths: List[Path], stale: List[Tuple[Path, Tuple[int, int]]], parsed: List[Dict[str, List[Tuple[Any, ...]]]]) -> Dict[str, Dict[str, Any]]:
+    # Novo conjunto de planilhas, sem alterar _SHARDS: só é publicado se o snapshot for montado
+    shards = {str(p): _SHARDS[str(p)] for p in paths if str(p) in _SHARDS}
+    for (path, fp), sheets in zip(stale, parsed):
+        shards[str(path)] = {"fingerprint": fp, "sheets": sheets}
+    return shards
+
+
+def _build_cache(shards: List[List[Tuple[Any, ...]]]) -> Dict[str, Any]:
+    shards = [rows for rows in shards if rows]
+    if not shards:
+        raise ValueError("Planilha vazia")
 
     preferred_aliases: Dict[str, str] = {
         "id_do_barco": "ID do Barco",
@@ -93,6 +248,42 @@ def _load_dataframe(refresh: bool = False) -> Tuple[List[Dict[str, Any]], Option
         "outros_servicos": "Outros Serviços",
     }
 
+    # Reconcilia cabeçalhos entre abas/planilhas pelo nome normalizado,
+    # preferindo os nomes originais conhecidos quando alguma aba os usa
+    all_names = {str(cell) for rows in shards for cell in rows[0] if cell is not None}
+    headers: List[str] = []
+    canonical: Dict[str, str] = {alias: name for alias, name in preferred_aliases.items() if name in all_names}
+    shard_headers: List[List[str]] = []
+    for rows in shards:
+        local: List[str] = []
+        for i, cell in enumerate(rows[0]):
+            name = str(cell) if cell is not None else f"col_{i}"
+            key = _normalize_name(name)
+            canonical.setdefault(key, name)
+            # Colunas repetidas dentro da mesma aba continuam separadas
+            column = canonical[key] if canonical[key] not in local else name
+            if column not in headers:
+                headers.append(column)
+            local.append(column)
+        shard_headers.append(local)
+    
+    # Converte para lista de dicionários com ID global sequencial; toda linha
+    # recebe todas as colunas reconciliadas (None onde a aba não tem a coluna)
+    records = []
+    for rows, local in zip(shards, shard_headers):
+        for row in rows[1:]:
+            record = {"id": len(records), **dict.fromkeys(headers)}
+            for j, value in enumerate(row):
+                if j < len(local):
+                    record[local[j]] = value
+            records.append(record)
+
+    # Constrói mapa de apelidos
+    alias_map: Dict[str, str] = {}
+    for col in headers:
+        alias = _normalize_name(col)
+        alias_map.setdefault(alias, col)
+
     for alias, desired_original in preferred_aliases.items():
         if desired_original in headers:
             alias_map[alias] = desired_original
@@ -116,8 +307,52 @@ def _load_dataframe(refresh: bool = False) -> Tuple[List[Dict[str, Any]], Option
         else:
             record["services_list"] = []
 
-    _CACHE = {"df": records, "services_column": services_col, "alias_map": alias_map}
-    return list(records), services_col, alias_map
+    # Índice por id para consultas de detalhe sem varredura
+    by_id = {record["id"]: record for record in records}
+
+    return {"df": records, "headers": headers, "services_column": services_col, "alias_map": alias_map, "by_id": by_id}
+
+
+def _load_dataframe() -> Tuple[List[Dict[str, Any]], Optional[str], Dict[str, str]]:
+    # Leitura do snapshot já carregado; a ingestão fica em _load_dataframe_async
+    return list(_CACHE["df"]), _CACHE["services_column"], dict(_CACHE["alias_map"])  # type: ignore
+
+
+async def _ensure_loaded(refresh: bool = False) -> None:
+    global _CACHE, _SHARDS
+    # Cache quente: nada a fazer, segue no event loop
+    if _CACHE["df"] is not None and not refresh:
+        return
+
+    async with _get_ingest_lock():
+        # Outra requisição pode ter carregado a planilha enquanto aguardávamos
+        if _CACHE["df"] is not None and not refresh:
+            return
+
+        paths = _resolve_sources()
+        stale = _stale_sources(paths)
+        # Só relê as planilhas cuja impressão digital mudou; cada uma em um processo
+        if _needs_rebuild(paths, stale):
+            loop = asyncio.get_running_loop()
+            parsed: List[Dict[str, List[Tuple[Any, ...]]]] = []
+            if stale:
+                executor = _get_ingest_executor(len(stale))
+                parsed = list(await asyncio.gather(*(loop.run_in_executor(executor, _read_workbook, str(path), EXCEL_SHEETS) for path, _ in stale)))
+            shards = _merge_shards(paths, stale, parsed)
+            rows = [sheet for p in paths for sheet in shards[str(p)]["sheets"].values()]
+            cache = await loop.run_in_executor(_get_scan_executor(), _build_cache, rows)
+            # Publica planilhas e snapshot juntos; se algo acima falhar, o próximo refresh relê tudo de novo
+            cache["generation"] = _CACHE["generation"] + 1
+            _SHARDS = shards
+            _CACHE = cache
+            # Respostas do snapshot anterior nunca mais serão usadas
+            _RESPONSES["entries"].clear()
+            _RESPONSES["bytes"] = 0
+
+
+async def _load_dataframe_async(refresh: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str], Dict[str, str]]:
+    await _ensure_loaded(refresh=refresh)
+    return _load_dataframe()
 
 
 def _to_records(records: List[Dict[str, Any]], include_services_list: bool = False) -> List[Dict[str, Any]]:
@@ -141,17 +376,117 @@ def _parse_in_list(value: str) -> List[str]:
     return [v.strip() for v in value.split(",") if v.strip()]
 
 
-def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], services_col: Optional[str], alias_map: Dict[str, str]) -> List[Dict[str, Any]]:
-    reserved = {
-        "limit", "offset", "sort_by", "sort_order", "columns",
-        "services_any", "services_all", "services_not", "refresh", "format",
-    }
+_RESERVED_PARAMS = {
+    "limit", "offset", "sort_by", "sort_order", "columns",
+    "services_any", "services_all", "services_not", "refresh", "format", "count_only",
+}
+
+# Custo relativo por linha visitada e fração estimada de linhas que passam em cada operador
+_OP_COST: Dict[str, Tuple[float, float]] = {
+    "eq": (1.0, 0.1),
+    "in": (1.2, 0.2),
+    "isnull": (0.6, 0.5),
+    "lt": (1.0, 0.5),
+    "lte": (1.0, 0.5),
+    "gt": (1.0, 0.5),
+    "gte": (1.0, 0.5),
+    "between": (1.0, 0.3),
+    "auto": (1.2, 0.3),
+    "contains": (1.0, 0.3),
+}
+# Serializar cada célula devolvida (jsonable_encoder + JSON + compressão) custa ~10 visitas de filtro
+_EMIT_CELL_COST = 10.0
+
+
+def _estimate_query_cost(n_rows: int, n_cols: int, qp: Dict[str, str], count_only: bool = False) -> float:
+    # Estimativa barata (sem tocar nas linhas) do trabalho de filtrar, ordenar e montar a página
+    cost = 0.0
+    estimated = float(n_rows)
+    for raw_key in qp:
+        if raw_key in _RESERVED_PARAMS:
+            continue
+        op = raw_key.split("__", 1)[1] if "__" in raw_key else "auto"
+        per_row, selectivity = _OP_COST.get(op, (1.0, 1.0))
+        cost += estimated * per_row
+        estimated *= selectivity
+
+    services_filters = [k for k in ("services_any", "services_all", "services_not") if qp.get(k)]
+    if services_filters:
+        cost += estimated
+        estimated *= 0.5 ** len(services_filters)
 
-    filtered = list(records)
+    if count_only:
+        return cost
+
+    # Cada chave de ordenação: uma passada para separar ausentes + n log n comparações
+    sort_keys = [t for t in str(qp.get("sort_by", "")).split(",") if t.strip()]
+    if sort_keys and estimated > 1:
+        cost += len(sort_keys) * estimated * (1.0 + 0.05 * math.log2(estimated))
+
+    # Linhas e colunas efetivamente devolvidas
+    try:
+        limit, offset = int(qp.get("limit", "0")), int(qp.get("offset", "0"))
+    except ValueError:
+        limit, offset = 0, 0
+    emitted = max(0.0, estimated - max(offset, 0))
+    if limit > 0:
+        emitted = min(emitted, limit)
+    columns = [c for c in str(qp.get("columns", "")).split(",") if c.strip()]
+    out_cols = len(columns) + (0 if "id" in columns else 1) if columns else n_cols
+    cost += emitted * (1.0 + out_cols * _EMIT_CELL_COST)
+    return cost
+
+
+def _cost_class(cost: float) -> str:
+    return "expensive" if cost >= EXPENSIVE_QUERY_COST else "cheap"
+
+
+@asynccontextmanager
+async def _admit(cost_class: str) -> AsyncIterator[None]:
+    state = _ADMISSION.get(cost_class)
+    if state is None:
+        limit, queue = ADMISSION_LIMITS[cost_class]
+        state = {"semaphore": asyncio.Semaphore(max(1, limit)), "waiting": 0, "queue": queue}
+        _ADMISSION[cost_class] = state
+
+    semaphore: asyncio.Semaphore = state["semaphore"]
+    retry_after = {"Retry-After": str(RETRY_AFTER_SECONDS)}
+    if semaphore.locked():
+        # Fila cheia: rejeita na hora em vez de acumular requisições
+        if state["waiting"] >= state["queue"]:
+            raise HTTPException(status_code=429, detail="Muitas consultas em andamento; tente novamente mais tarde", headers=retry_after)
+        state["waiting"] += 1
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=ADMISSION_WAIT_SECONDS)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=503, detail="Servidor sobrecarregado; tente novamente mais tarde", headers=retry_after)
+        finally:
+            state["waiting"] -= 1
+    else:
+        await semaphore.acquire()
+
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+async def _run_admitted(n_rows: int, n_cols: int, qp: Dict[str, str], count_only: bool, func: Any, *args: Any) -> Any:
+    cost_class = _cost_class(_estimate_query_cost(n_rows, n_cols, qp, count_only=count_only))
+    async with _admit(cost_class):
+        # Filtro, ordenação e serialização sempre no pool de threads: no event loop
+        # ficam só os acertos de cache e as consultas por id
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_scan_executor(), func, *args)
+
+
+def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], services_col: Optional[str], alias_map: Dict[str, str]) -> List[int]:
+    # Trabalha sobre posições das linhas (row-ids) em vez de dicionários
+    filtered = list(range(len(records)))
 
     # Aplica filtros de coluna
     for raw_key, raw_value in qp.items():
-        if raw_key in reserved:
+        if raw_key in _RESERVED_PARAMS:
             continue
 
         if "__" in raw_key:
@@ -160,7 +495,7 @@ def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], se
             column, op = raw_key, "auto"
 
         # Resolve apelido
-        if column not in (filtered[0].keys() if filtered else []):
+        if column not in (records[filtered[0]].keys() if filtered else []):
             alias = _normalize_name(column)
             if alias in alias_map:
                 column = alias_map[alias]
@@ -171,53 +506,53 @@ def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], se
 
         # Aplica filtro
         new_filtered = []
-        for record in filtered:
-            cell_value = record.get(column)
+        for i in filtered:
+            cell_value = records[i].get(column)
             
             if op == "auto":
                 # Tenta igualdade numérica primeiro, senão contains
                 try:
                     comp = _try_parse_number(val)
                     if isinstance(cell_value, (int, float)) and cell_value == comp:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
                     elif str(cell_value).lower().find(str(val).lower()) >= 0:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
                 except:
                     if str(cell_value).lower().find(str(val).lower()) >= 0:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
             elif op == "eq":
                 if isinstance(cell_value, (int, float)):
                     comp = _try_parse_number(val)
                     if cell_value == comp:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
                 else:
                     if str(cell_value).lower() == str(val).lower():
-                        new_filtered.append(record)
+                        new_filtered.append(i)
             elif op == "contains":
                 if str(cell_value).lower().find(str(val).lower()) >= 0:
-                    new_filtered.append(record)
+                    new_filtered.append(i)
             elif op == "in":
                 values = _parse_in_list(val)
                 if isinstance(cell_value, (int, float)):
                     parsed = [_try_parse_number(v) for v in values]
                     if cell_value in parsed:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
                 else:
                     lowered = [v.lower() for v in values]
                     if str(cell_value).lower() in lowered:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
             elif op in {"lt", "lte", "gt", "gte"}:
                 try:
                     comp = _try_parse_number(val)
                     if isinstance(cell_value, (int, float)):
                         if op == "lt" and cell_value < comp:
-                            new_filtered.append(record)
+                            new_filtered.append(i)
                         elif op == "lte" and cell_value <= comp:
-                            new_filtered.append(record)
+                            new_filtered.append(i)
                         elif op == "gt" and cell_value > comp:
-                            new_filtered.append(record)
+                            new_filtered.append(i)
                         elif op == "gte" and cell_value >= comp:
-                            new_filtered.append(record)
+                            new_filtered.append(i)
                 except:
                     pass
             elif op == "between":
@@ -227,14 +562,14 @@ def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], se
                 try:
                     lo, hi = _try_parse_number(parts[0]), _try_parse_number(parts[1])
                     if isinstance(cell_value, (int, float)) and lo <= cell_value <= hi:
-                        new_filtered.append(record)
+                        new_filtered.append(i)
                 except:
                     pass
             elif op == "isnull":
                 truthy = str(val).lower() in {"1", "true", "t", "yes", "y"}
                 is_null = cell_value is None or (isinstance(cell_value, str) and not cell_value.strip())
                 if (truthy and is_null) or (not truthy and not is_null):
-                    new_filtered.append(record)
+                    new_filtered.append(i)
             else:
                 raise HTTPException(status_code=400, detail=f"Operador desconhecido: {op} (coluna {column})")
         
@@ -265,13 +600,13 @@ def _apply_generic_filters(records: List[Dict[str, Any]], qp: Dict[str, str], se
                 return False
             return True
 
-        filtered = [r for r in filtered if matches(r.get("services_list", []))]
+        filtered = [i for i in filtered if matches(records[i].get("services_list", []))]
 
     return filtered
 
 
 @app.get("/")
-def root() -> Dict[str, Any]:
+async def root() -> Dict[str, Any]:
     return {
         "name": app.title,
         "version": app.version,
@@ -282,28 +617,43 @@ def root() -> Dict[str, Any]:
 
 
 @app.get("/schema")
-def schema(refresh: bool = False) -> Dict[str, Any]:
-    records, services_col, alias_map = _load_dataframe(refresh=refresh)
+async def schema(refresh: bool = False) -> Dict[str, Any]:
+    records, services_col, alias_map = await _load_dataframe_async(refresh=refresh)
     if records:
-        cols = [{"name": str(c), "dtype": "mixed"} for c in records[0].keys() if c != "services_list"]
+        cols = [{"name": str(c), "dtype": "mixed"} for c in ["id"] + _CACHE["headers"]]
     else:
         cols = []
     aliases = [{"alias": a, "column": o} for a, o in alias_map.items() if o != "services_list"]
     return {"columns": cols, "aliases": aliases, "services_column": services_col, "count": len(records)}
 
 
-@app.get("/boats")
-def list_boats(request: Request) -> Dict[str, Any]:
-    qp = dict(request.query_params)
+def _parse_pagination(qp: Dict[str, str]) -> Tuple[int, int]:
+    try:
+        return int(qp.get("limit", "0")), int(qp.get("offset", "0"))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Parâmetros de paginação inválidos")
 
-    refresh = str(qp.get("refresh", "false")).lower() in {"1", "true", "t", "yes", "y"}
-    records, services_col, alias_map = _load_dataframe(refresh=refresh)
 
-    filtered = _apply_generic_filters(records, qp, services_col, alias_map)
+def _is_count_only(qp: Dict[str, str]) -> bool:
+    # count_only=true ou limit=0 explícito: só o total, sem ordenar nem montar linhas
+    if str(qp.get("count_only", "false")).lower() in {"1", "true", "t", "yes", "y"}:
+        return True
+    return "limit" in qp and _parse_pagination(qp)[0] == 0
+
+
+def _query_boats(records: List[Dict[str, Any]], qp: Dict[str, str], services_col: Optional[str], alias_map: Dict[str, str], count_only: bool = False) -> Dict[str, Any]:
+    # Paginação
+    limit, offset = _parse_pagination(qp)
+
+    selection = _apply_generic_filters(records, qp, services_col, alias_map)
+    total = len(selection)
+
+    if count_only or _is_count_only(qp):
+        return {"total": total, "count": 0, "items": []}
 
     # Ordenação
     sort_by = qp.get("sort_by")
-    if sort_by and filtered:
+    if sort_by and selection:
         sort_keys = []
         for token in sort_by.split(","):
             token = token.strip()
@@ -320,7 +670,7 @@ def list_boats(request: Request) -> Dict[str, Any]:
                 reverse = False
             
             # Resolve apelido
-            if col not in filtered[0].keys():
+            if col not in records[selection[0]].keys():
                 alias = _normalize_name(col)
                 if alias in alias_map:
                     col = alias_map[alias]
@@ -329,21 +679,25 @@ def list_boats(request: Request) -> Dict[str, Any]:
             
             sort_keys.append((col, reverse))
         
-        # Aplica ordenação múltipla
+        # Aplica ordenação múltipla (valores ausentes sempre ao final)
         for col, reverse in reversed(sort_keys):
-            filtered.sort(key=lambda x: x.get(col, ""), reverse=reverse)
+            missing_rows = [i for i in selection if records[i].get(col) is None]
+            present = [i for i in selection if records[i].get(col) is not None]
+            present.sort(key=lambda i: records[i][col], reverse=reverse)
+            selection = present + missing_rows
 
-    # Projeção de colunas
+    # Resolve colunas da projeção (validação usa a seleção inteira, como antes)
     columns = qp.get("columns")
-    if columns and filtered:
+    resolved: Optional[List[str]] = None
+    if columns and selection:
         requested = [c.strip() for c in columns.split(",") if c.strip()]
         if "id" not in requested:
             requested = ["id"] + requested
         
-        resolved: List[str] = []
+        resolved = []
         missing: List[str] = []
         for c in requested:
-            if c in filtered[0].keys():
+            if c in records[selection[0]].keys():
                 resolved.append(c)
             elif c == "services_list":
                 continue
@@ -356,34 +710,122 @@ def list_boats(request: Request) -> Dict[str, Any]:
         
         if missing:
             raise HTTPException(status_code=400, detail=f"Colunas inexistentes na projeção: {', '.join(missing)}")
-        
-        # Projeta colunas
-        filtered = [{k: record[k] for k in resolved if k in record} for record in filtered]
-
-    # Paginação
-    try:
-        limit = int(qp.get("limit", "0"))
-        offset = int(qp.get("offset", "0"))
-    except ValueError:
-        raise HTTPException(status_code=400, detail="Parâmetros de paginação inválidos")
 
-    total = len(filtered)
+    # Recorta a página ainda sobre row-ids
     if offset > 0:
-        filtered = filtered[offset:]
+        selection = selection[offset:]
     if limit and limit > 0:
-        filtered = filtered[:limit]
+        selection = selection[:limit]
+
+    # Projeta apenas as linhas da página
+    page = [records[i] for i in selection]
+    if resolved is not None:
+        page = [{k: record[k] for k in resolved if k in record} for record in page]
 
     include_services_list = str(qp.get("format", "")).lower() == "debug"
-    data = _to_records(filtered, include_services_list=include_services_list)
+    data = _to_records(page, include_services_list=include_services_list)
     return {"total": total, "count": len(data), "items": data}
 
 
+def _encode_variants(payload: Dict[str, Any]) -> Dict[str, bytes]:
+    # Serializa uma vez e pré-computa as variantes comprimidas; roda sempre no
+    # pool de threads (via _render_boats), nunca no event loop
+    body = JSONResponse(jsonable_encoder(payload)).body
+    variants = {"identity": body}
+    if len(body) >= COMPRESS_MIN_BYTES:
+        variants["gzip"] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return variants
+
+
+def _render_boats(records: List[Dict[str, Any]], qp: Dict[str, str], services_col: Optional[str], alias_map: Dict[str, str]) -> Dict[str, bytes]:
+    return _encode_variants(_query_boats(records, qp, services_col, alias_map))
+
+
+def _response_cache_get(key: Tuple[Any, ...]) -> Optional[Dict[str, bytes]]:
+    entries = _RESPONSES["entries"]
+    variants = entries.get(key)
+    if variants is not None:
+        entries.move_to_end(key)
+    return variants
+
+
+def _response_cache_put(key: Tuple[Any, ...], variants: Dict[str, bytes]) -> None:
+    # Resposta calculada sobre um snapshot que já foi substituído: descarta
+    if key[0] != _CACHE["generation"]:
+        return
+
+    entries = _RESPONSES["entries"]
+    size = sum(len(v) for v in variants.values())
+    if size > RESPONSE_CACHE_BYTES or key in entries:
+        return
+    while entries and _RESPONSES["bytes"] + size > RESPONSE_CACHE_BYTES:
+        _, evicted = entries.popitem(last=False)
+        _RESPONSES["bytes"] -= sum(len(v) for v in evicted.values())
+    entries[key] = variants
+    _RESPONSES["bytes"] += size
+
+
+def _pick_encoding(accept_encoding: str, available: Iterable[str]) -> str:
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            accepted[token.strip().lower()] = q
+    for encoding in ("br", "gzip"):
+        if encoding in available and accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return "identity"
+
+
+@app.get("/boats")
+async def list_boats(request: Request) -> Response:
+    qp = dict(request.query_params)
+
+    refresh = str(qp.get("refresh", "false")).lower() in {"1", "true", "t", "yes", "y"}
+    await _ensure_loaded(refresh=refresh)
+    key = (_CACHE["generation"], tuple(sorted((k, v) for k, v in qp.items() if k != "refresh")))
+
+    # Respostas em cache são servidas direto no event loop, sem copiar o snapshot
+    variants = _response_cache_get(key)
+    if variants is None:
+        records, services_col, alias_map = _load_dataframe()
+        variants = await _run_admitted(len(records), len(_CACHE["headers"]) + 1, qp, _is_count_only(qp), _render_boats, records, qp, services_col, alias_map)
+        _response_cache_put(key, variants)
+
+    encoding = _pick_encoding(request.headers.get("accept-encoding", ""), variants)
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding != "identity":
+        headers["Content-Encoding"] = encoding
+    return Response(content=variants[encoding], media_type="application/json", headers=headers)
+
+
+@app.head("/boats")
+async def count_boats(request: Request) -> Response:
+    qp = dict(request.query_params)
+
+    refresh = str(qp.get("refresh", "false")).lower() in {"1", "true", "t", "yes", "y"}
+    records, services_col, alias_map = await _load_dataframe_async(refresh=refresh)
+
+    # HEAD devolve só o total, no cabeçalho X-Total-Count
+    result = await _run_admitted(len(records), len(_CACHE["headers"]) + 1, qp, True, _query_boats, records, qp, services_col, alias_map, True)
+    return Response(headers={"X-Total-Count": str(result["total"])})
+
+
 @app.get("/boats/{boat_id}")
-def get_boat(boat_id: int, refresh: bool = False) -> Dict[str, Any]:
-    records, _, _ = _load_dataframe(refresh=refresh)
-    for record in records:
-        if record.get("id") == boat_id:
-            return _to_records([record])[0]
+async def get_boat(boat_id: int, refresh: bool = False) -> Dict[str, Any]:
+    await _ensure_loaded(refresh=refresh)
+    record = _CACHE["by_id"].get(boat_id)
+    if record is not None:
+        return _to_records([record])[0]
     raise HTTPException(status_code=404, detail="Barco não encontrado")
 
 
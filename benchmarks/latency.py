@@ -0,0 +1,126 @@
+"""Latência de /boats/{id} enquanto consultas pesadas de /boats estão em andamento.
+
+Gera uma planilha sintética, sobe a API em processo (ASGI, sem rede) e mede a
+latência das consultas de detalhe com e sem carga concorrente.
+
+    python -m benchmarks.latency --rows 4999 --concurrency 6
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+from openpyxl import Workbook
+
+import app.main as main
+
+
+HEADERS = ["ID do Barco", "Preço por Dia (R$)", "Nome do Barco", "Marina/Porto", "Pés", "Tripulantes", "Preço do Arrais (R$)", "Outros Serviços"]
+MARINAS = ["Angra dos Reis", "Paraty", "Ilha Grande", "Urca - Rio de Janeiro", "Búzios"]
+SERVICES = ["Pesca", "Travessia", "Mergulho guiado", "Churrasco", "Skipper"]
+
+
+def build_workbook(path: Path, rows: int) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(HEADERS)
+    for i in range(rows):
+        ws.append([
+            i + 1,
+            500 + (i * 37) % 4500,
+            f"Barco {i}",
+            MARINAS[i % len(MARINAS)],
+            20 + i % 40,
+            2 + i % 15,
+            (i % 5) * 100,
+            ", ".join(SERVICES[: 1 + i % len(SERVICES)]),
+        ])
+    wb.save(path)
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def probe_details(client: httpx.AsyncClient, rows: int, stop: asyncio.Event) -> List[float]:
+    # A latência conta a partir do instante em que a consulta deveria sair, de
+    # modo que um event loop bloqueado aparece como atraso, e não como amostra faltante
+    samples: List[float] = []
+    i = 0
+    while True:
+        due = time.perf_counter() + 0.005
+        await asyncio.sleep(0.005)
+        response = await client.get(f"/boats/{i % rows}")
+        samples.append(time.perf_counter() - due)
+        assert response.status_code == 200
+        i += 1
+        # Checa depois de medir: a consulta que esperou o loop destravar também conta
+        if stop.is_set():
+            return samples
+
+
+async def run(rows: int, concurrency: int, query: str) -> Dict[str, Any]:
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/boats/0")
+
+        # Referência: detalhe sem carga concorrente
+        stop = asyncio.Event()
+        idle_task = asyncio.create_task(probe_details(client, rows, stop))
+        await asyncio.sleep(0.5)
+        stop.set()
+        idle = await idle_task
+
+        # Sob carga: consultas pesadas distintas (sem acerto no cache de respostas)
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe_details(client, rows, stop))
+        await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        heavy = await asyncio.gather(*(client.get(f"/boats?{query}&offset={i}") for i in range(concurrency)))
+        heavy_elapsed = time.perf_counter() - start
+        stop.set()
+        loaded = await probe_task
+
+    return {
+        "idle": summarize(idle),
+        "loaded": summarize(loaded),
+        "heavy_status": sorted({r.status_code for r in heavy}),
+        "heavy_elapsed_s": heavy_elapsed,
+    }
+
+
+def main_cli() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=4999)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--query", default="sort_by=-preco_por_dia_rs,pes", help="consulta pesada (sem offset)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "frota.xlsx"
+        build_workbook(path, args.rows)
+        main.EXCEL_PATH = path
+        main.EXCEL_SOURCES = []
+        result = asyncio.run(run(args.rows, args.concurrency, args.query))
+
+    for phase in ("idle", "loaded"):
+        stats = result[phase]
+        print(f"{phase:>6}: n={stats['n']:4d}  p50={stats['p50_ms']:7.1f} ms  p99={stats['p99_ms']:7.1f} ms  max={stats['max_ms']:7.1f} ms")
+    print(f" heavy: status={result['heavy_status']}  elapsed={result['heavy_elapsed_s']:.2f} s")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pytest
+from fastapi.testclient import TestClient
+from openpyxl import Workbook
+
+import app.main as main
+
+
+HEADERS = ["ID do Barco", "Preço por Dia (R$)", "Nome do Barco", "Marina/Porto", "Pés", "Outros Serviços"]
+ROWS = [
+    (1, 2497, "Vento Carioca", "Ilha Grande", 25, "Pesca"),
+    (2, 1465, "Maré Alta", "Urca - Rio de Janeiro", 50, "Mergulho guiado, Travessia"),
+    (3, 1800, "Brisa", "Angra dos Reis", 32, "Travessia"),
+    (4, 3200, "Sereia", "Angra dos Reis", 40, "Pesca, Skipper"),
+]
+
+
+def write_workbook(path: Path, sheets: Dict[str, Sequence[Sequence[Any]]]) -> Path:
+    wb = Workbook()
+    wb.remove(wb.active)
+    for title, rows in sheets.items():
+        ws = wb.create_sheet(title)
+        for row in rows:
+            ws.append(list(row))
+    wb.save(path)
+    return path
+
+
+@pytest.fixture
+def make_workbook(tmp_path: Path) -> Callable[..., Path]:
+    def factory(name: str, sheets: Optional[Dict[str, Sequence[Sequence[Any]]]] = None) -> Path:
+        return write_workbook(tmp_path / name, sheets or {"Sheet1": [HEADERS, *ROWS]})
+    return factory
+
+
+@pytest.fixture(autouse=True)
+def fresh_state(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # Cada teste começa sem snapshot, cache de respostas nem filas de admissão,
+    # lendo planilhas em thread (sem subir processos)
+    monkeypatch.setattr(main, "_CACHE", {"df": None, "headers": None, "services_column": None, "alias_map": None, "by_id": None, "generation": 0})
+    monkeypatch.setattr(main, "_SHARDS", {})
+    monkeypatch.setattr(main, "_RESPONSES", {"entries": OrderedDict(), "bytes": 0})
+    monkeypatch.setattr(main, "_ADMISSION", {})
+    monkeypatch.setattr(main, "_INGEST_LOCK", None)
+    monkeypatch.setattr(main, "INGEST_WORKERS", 0)
+    monkeypatch.setattr(main, "EXCEL_PATH", write_workbook(tmp_path / "base.xlsx", {"Sheet1": [HEADERS, *ROWS]}))
+    monkeypatch.setattr(main, "EXCEL_SOURCES", [])
+    monkeypatch.setattr(main, "EXCEL_SHEETS", [])
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def use_sources(monkeypatch: pytest.MonkeyPatch) -> Callable[..., None]:
+    def setter(sources: List[str], sheets: Optional[List[str]] = None) -> None:
+        monkeypatch.setattr(main, "EXCEL_SOURCES", sources)
+        monkeypatch.setattr(main, "EXCEL_SHEETS", sheets or [])
+    return setter
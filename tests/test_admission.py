@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import app.main as main
+
+
+def test_estimator_classes_partner_queries_as_expensive():
+    full_sort = main._estimate_query_cost(4999, 9, {"sort_by": "-preco_por_dia_rs,pes"})
+    paged_sort = main._estimate_query_cost(4999, 9, {"sort_by": "-preco_por_dia_rs,pes", "limit": "20"})
+    indexed = main._estimate_query_cost(4999, 9, {"marina_porto__eq": "Paraty", "limit": "20"})
+    count = main._estimate_query_cost(4999, 9, {"nome_do_barco__contains": "a", "sort_by": "pes"}, count_only=True)
+
+    assert main._cost_class(full_sort) == "expensive"
+    assert main._cost_class(paged_sort) == "cheap"
+    assert main._cost_class(indexed) == "cheap"
+    assert main._cost_class(count) == "cheap"
+    # Projeção reduz o custo de serialização
+    assert main._estimate_query_cost(4999, 9, {"columns": "id"}) < main._estimate_query_cost(4999, 9, {})
+
+
+def _slow_render(monkeypatch, seconds):
+    original = main._render_boats
+
+    def slow(*args):
+        time.sleep(seconds)
+        return original(*args)
+
+    monkeypatch.setattr(main, "_render_boats", slow)
+
+
+async def _burst(queries, probe=None):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        await client.get("/boats/0")
+        tasks = [asyncio.create_task(client.get(q)) for q in queries]
+        await asyncio.sleep(0.05)
+        probe_result = None
+        if probe is not None:
+            start = time.perf_counter()
+            response = await client.get(probe)
+            probe_result = (response.status_code, time.perf_counter() - start)
+        return [await t for t in tasks], probe_result
+
+
+@pytest.mark.parametrize("cost_class", ["cheap", "expensive"])
+def test_full_queue_gets_429_and_timeout_gets_503(monkeypatch, cost_class):
+    monkeypatch.setattr(main, "EXPENSIVE_QUERY_COST", 0 if cost_class == "expensive" else float("inf"))
+    monkeypatch.setitem(main.ADMISSION_LIMITS, cost_class, (1, 1))
+    monkeypatch.setattr(main, "ADMISSION_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(main, "RETRY_AFTER_SECONDS", 7)
+    _slow_render(monkeypatch, 0.5)
+
+    # Consultas distintas para não acertar o cache de respostas
+    responses, probe = asyncio.run(_burst([f"/boats?limit={i}" for i in range(1, 4)], probe="/boats/2"))
+    statuses = sorted(r.status_code for r in responses)
+
+    assert statuses == [200, 429, 503]
+    for response in responses:
+        if response.status_code != 200:
+            assert response.headers["Retry-After"] == "7"
+
+    # Detalhe não passa pela admissão nem espera as consultas lentas
+    status, elapsed = probe
+    assert status == 200
+    assert elapsed < 0.2
+
+
+def test_cheap_queries_are_not_blocked_by_expensive_class(monkeypatch):
+    monkeypatch.setitem(main.ADMISSION_LIMITS, "expensive", (1, 0))
+    _slow_render(monkeypatch, 0.3)
+    # Só ordenações da frota inteira contam como caras neste teste
+    monkeypatch.setattr(main, "EXPENSIVE_QUERY_COST", main._estimate_query_cost(4, 7, {"sort_by": "pes"}))
+
+    queries = ["/boats?sort_by=pes", "/boats?sort_by=-pes"]
+    responses, probe = asyncio.run(_burst(queries, probe="/boats?limit=1"))
+    assert sorted(r.status_code for r in responses) == [200, 429]
+    assert probe[0] == 200
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import pytest
+
+
+def test_list_filters_sorts_and_projects(client):
+    response = client.get("/boats", params={"marina_porto": "Angra", "sort_by": "-preco_por_dia_rs", "columns": "nome_do_barco"})
+    assert response.status_code == 200
+    assert response.json() == {
+        "total": 2,
+        "count": 2,
+        "items": [{"id": 3, "Nome do Barco": "Sereia"}, {"id": 2, "Nome do Barco": "Brisa"}],
+    }
+
+
+def test_pagination_counts_before_slicing(client):
+    body = client.get("/boats", params={"limit": 1, "offset": 1}).json()
+    assert body["total"] == 4
+    assert [item["id"] for item in body["items"]] == [1]
+
+
+@pytest.mark.parametrize("params", [{"count_only": "true"}, {"limit": "0"}, {"limit": "00"}, {"limit": "+0"}])
+def test_count_only_modes_return_total_without_items(client, params):
+    body = client.get("/boats", params={"marina_porto": "Angra", **params}).json()
+    assert body == {"total": 2, "count": 0, "items": []}
+
+
+def test_count_only_skips_sort_validation(client):
+    body = client.get("/boats", params={"count_only": "true", "sort_by": "inexistente"}).json()
+    assert body["total"] == 4
+
+
+def test_invalid_limit_is_rejected(client):
+    assert client.get("/boats", params={"limit": "x"}).status_code == 400
+
+
+def test_head_returns_total_header(client):
+    response = client.head("/boats", params={"services_any": "pesca"}, headers={"Origin": "https://app.example"})
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "2"
+    assert response.content == b""
+    exposed = {h.strip() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert {"X-Total-Count", "Retry-After"} <= exposed
+
+
+def test_detail_uses_id_index(client):
+    assert client.get("/boats/1").json()["Nome do Barco"] == "Maré Alta"
+    assert client.get("/boats/99").status_code == 404
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import os
+
+import app.main as main
+from tests.conftest import HEADERS, ROWS
+
+
+def _bump_mtime(path):
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+def test_merges_workbooks_with_mismatched_headers(client, make_workbook, use_sources, tmp_path):
+    make_workbook("a_norte.xlsx", {"Sheet1": [["Nome do Barco", "Preco por dia (R$)"], ["Alfa", 900], ["Beta", 700]]})
+    make_workbook("b_sul.xlsx", {"Sheet1": [["Nome do Barco", "Preço por Dia (R$)", "Pés"], ["Gama", 1200, 30]]})
+    use_sources([str(tmp_path / "*_*.xlsx")])
+
+    columns = [c["name"] for c in client.get("/schema").json()["columns"]]
+    assert columns == ["id", "Nome do Barco", "Preço por Dia (R$)", "Pés"]
+
+    items = client.get("/boats", params={"columns": "nome_do_barco,pes"}).json()["items"]
+    assert items == [
+        {"id": 0, "Nome do Barco": "Alfa", "Pés": None},
+        {"id": 1, "Nome do Barco": "Beta", "Pés": None},
+        {"id": 2, "Nome do Barco": "Gama", "Pés": 30},
+    ]
+
+    # Valores ausentes vão para o fim em qualquer direção
+    for sort_by in ("pes", "-pes"):
+        response = client.get("/boats", params={"sort_by": sort_by})
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()["items"]] == [2, 0, 1]
+
+
+def test_reads_selected_sheets_and_rejects_unknown_names(client, make_workbook, use_sources):
+    path = make_workbook("regioes.xlsx", {"Norte": [HEADERS, ROWS[0]], "Sul": [HEADERS, ROWS[1], ROWS[2]]})
+
+    use_sources([str(path)], ["*"])
+    assert client.get("/boats", params={"limit": 0}).json()["total"] == 3
+
+    use_sources([str(path)], ["Sul", "Leste"])
+    main._CACHE["df"] = None
+    main._SHARDS.clear()
+    response = client.get("/boats")
+    assert response.status_code == 500
+
+    try:
+        main._read_workbook(str(path), ["Sul", "Leste"])
+    except ValueError as exc:
+        assert "Leste" in str(exc) and "regioes.xlsx" in str(exc)
+    else:
+        raise AssertionError("aba inexistente deveria falhar")
+
+
+def test_refresh_reparses_only_changed_workbooks(client, make_workbook, use_sources, tmp_path, monkeypatch):
+    first = make_workbook("a.xlsx", {"Sheet1": [HEADERS, ROWS[0]]})
+    make_workbook("b.xlsx", {"Sheet1": [HEADERS, ROWS[1]]})
+    use_sources([str(tmp_path / "[ab].xlsx")])
+
+    parsed = []
+    original = main._read_workbook
+
+    def counting(path, sheets=None):
+        parsed.append(os.path.basename(path))
+        return original(path, sheets)
+
+    monkeypatch.setattr(main, "_read_workbook", counting)
+
+    assert client.get("/boats", params={"limit": 0}).json()["total"] == 2
+    assert sorted(parsed) == ["a.xlsx", "b.xlsx"]
+
+    parsed.clear()
+    client.get("/boats", params={"refresh": "true", "limit": 0})
+    assert parsed == []
+    assert main._CACHE["generation"] == 1
+
+    make_workbook("a.xlsx", {"Sheet1": [HEADERS, ROWS[0], ROWS[2]]})
+    _bump_mtime(first)
+    assert client.get("/boats", params={"refresh": "true", "limit": 0}).json()["total"] == 3
+    assert parsed == ["a.xlsx"]
+    assert main._CACHE["generation"] == 2
+
+
+def test_failed_rebuild_is_retried_on_next_refresh(client, make_workbook, use_sources):
+    path = make_workbook("a.xlsx")
+    use_sources([str(path)])
+    assert client.get("/boats", params={"limit": 0}).json()["total"] == 4
+
+    make_workbook("a.xlsx", {"Sheet1": []})
+    _bump_mtime(path)
+    assert client.get("/boats", params={"refresh": "true"}).status_code == 500
+    # O snapshot antigo não pode ser "promovido" por um refresh seguinte
+    assert client.get("/boats", params={"refresh": "true"}).status_code == 500
+
+    make_workbook("a.xlsx")
+    _bump_mtime(path)
+    assert client.get("/boats", params={"refresh": "true", "limit": 0}).json()["total"] == 4
+
+
+def test_ingest_in_process_pool(client, monkeypatch):
+    monkeypatch.setattr(main, "INGEST_WORKERS", 2)
+    monkeypatch.setattr(main, "_INGEST_POOL_SIZE", 0)
+    monkeypatch.setattr(main, "_EXECUTORS", {"ingest": None, "scan": main._EXECUTORS["scan"]})
+    try:
+        assert client.get("/boats", params={"limit": 0}).json()["total"] == 4
+        assert main._INGEST_POOL_SIZE == 1
+    finally:
+        if main._EXECUTORS["ingest"] is not None:
+            main._EXECUTORS["ingest"].shutdown()
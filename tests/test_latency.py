@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import asyncio
+
+import app.main as main
+from benchmarks.latency import build_workbook, run
+
+
+def test_detail_latency_stays_flat_under_uncached_load(tmp_path, monkeypatch):
+    # Cenário do harness: ~5 mil linhas e 6 páginas completas não cacheadas em paralelo.
+    # Com o processamento no event loop, /boats/{id} ficava parado por mais de 1 s.
+    path = tmp_path / "frota.xlsx"
+    build_workbook(path, 4999)
+    monkeypatch.setattr(main, "EXCEL_PATH", path)
+    monkeypatch.setitem(main.ADMISSION_LIMITS, "expensive", (2, 16))
+    monkeypatch.setattr(main, "ADMISSION_WAIT_SECONDS", 30.0)
+
+    result = asyncio.run(run(4999, 6, "limit=5000"))
+
+    assert result["heavy_status"] == [200]
+    assert result["loaded"]["n"] > 10
+    assert result["loaded"]["max_ms"] < 500
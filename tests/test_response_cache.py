@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import gzip
+import json
+
+import pytest
+
+import app.main as main
+
+
+def _raw_get(client, url, accept_encoding):
+    # Desativa a descompressão automática para inspecionar os bytes enviados
+    with client.stream("GET", url, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize(
+    "accept, available, expected",
+    [
+        ("gzip, deflate", {"identity", "gzip"}, "gzip"),
+        ("br;q=1.0, gzip;q=0.5", {"identity", "gzip", "br"}, "br"),
+        ("gzip;q=0", {"identity", "gzip", "br"}, "identity"),
+        ("*", {"identity", "gzip"}, "gzip"),
+        ("", {"identity", "gzip"}, "identity"),
+        ("gzip", {"identity"}, "identity"),
+    ],
+)
+def test_pick_encoding(accept, available, expected):
+    assert main._pick_encoding(accept, available) == expected
+
+
+def test_serves_precomputed_gzip_variant(client, monkeypatch):
+    monkeypatch.setattr(main, "COMPRESS_MIN_BYTES", 1)
+    identity, plain = _raw_get(client, "/boats", "identity")
+    compressed, body = _raw_get(client, "/boats", "gzip")
+
+    assert "content-encoding" not in identity.headers
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["vary"]
+    assert gzip.decompress(body) == plain
+    assert json.loads(plain)["total"] == 4
+
+    # Um único item no cache com as duas variantes, contadas no orçamento
+    (variants,) = main._RESPONSES["entries"].values()
+    assert set(variants) >= {"identity", "gzip"}
+    assert main._RESPONSES["bytes"] == sum(len(v) for v in variants.values())
+
+
+def test_small_responses_are_not_compressed(client):
+    response, _ = _raw_get(client, "/boats?columns=id&limit=1", "gzip")
+    assert "content-encoding" not in response.headers
+
+
+def test_cache_hit_skips_rendering(client, monkeypatch):
+    client.get("/boats", params={"limit": 2})
+
+    def fail(*args):
+        raise AssertionError("resposta deveria vir do cache")
+
+    monkeypatch.setattr(main, "_render_boats", fail)
+    assert client.get("/boats", params={"limit": 2}).json()["count"] == 2
+
+
+def test_eviction_respects_budget(client, monkeypatch):
+    monkeypatch.setattr(main, "RESPONSE_CACHE_BYTES", 1000)
+    for limit in range(1, 5):
+        client.get("/boats", params={"limit": limit})
+    entries = main._RESPONSES["entries"]
+    assert main._RESPONSES["bytes"] <= 1000
+    assert main._RESPONSES["bytes"] == sum(len(v) for e in entries.values() for v in e.values())
+    # As mais antigas saem primeiro; a mais recente sempre fica
+    assert (("limit", "1"),) not in [key[1] for key in entries]
+    assert list(entries)[-1][1] == (("limit", "4"),)
+
+
+def test_new_snapshot_purges_and_stale_puts_are_dropped(client, monkeypatch):
+    client.get("/boats", params={"limit": 1})
+    generation = main._CACHE["generation"]
+    assert len(main._RESPONSES["entries"]) == 1
+
+    main.EXCEL_PATH.touch()
+    monkeypatch.setattr(main, "_fingerprint", lambda path: (0, 0))
+    client.get("/boats", params={"refresh": "true", "limit": 2})
+    assert main._CACHE["generation"] == generation + 1
+    assert [key[0] for key in main._RESPONSES["entries"]] == [generation + 1]
+
+    # Resposta atrasada do snapshot anterior não entra no cache
+    main._response_cache_put((generation, ()), {"identity": b"{}"})
+    assert [key[0] for key in main._RESPONSES["entries"]] == [generation + 1]